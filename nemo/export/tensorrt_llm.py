@@ -32,7 +32,7 @@ from tensorrt_llm._utils import numpy_to_torch
 
 from nemo.deploy import ITritonDeployable
 from nemo.export.tarutils import TarPath, unpack_tarball
-from nemo.export.trt_llm.converter.model_converter import model_to_trtllm_ckpt
+from nemo.export.trt_llm.converter.model_converter import iter_model_to_trtllm_ckpt, model_to_trtllm_ckpt
 from nemo.export.trt_llm.converter.model_to_trt_llm_ckpt import dist_model_to_trt_llm_ckpt
 from nemo.export.trt_llm.converter.utils import init_model_parallel_from_nemo
 from nemo.export.trt_llm.nemo_ckpt_loader.nemo_file import (
@@ -313,7 +313,7 @@ class TensorRTLLM(ITritonDeployable):
                     model_type = "llama"
 
                 model, model_configs, self.tokenizer = load_nemo_model(nemo_checkpoint_path, nemo_export_dir)
-                weights_dicts, model_configs = model_to_trtllm_ckpt(
+                for weight_dict, model_config in iter_model_to_trtllm_ckpt(
                     model=model,
                     nemo_model_config=model_configs,
                     nemo_export_dir=nemo_export_dir,
@@ -324,9 +324,7 @@ class TensorRTLLM(ITritonDeployable):
                     gpus_per_node=gpus_per_node,
                     use_parallel_embedding=use_parallel_embedding,
                     use_embedding_sharing=use_embedding_sharing,
-                )
-
-                for weight_dict, model_config in zip(weights_dicts, model_configs):
+                ):
                     build_and_save_engine(
                         max_input_len=max_input_len,
                         max_output_len=max_output_len,
@@ -411,7 +409,8 @@ class TensorRTLLM(ITritonDeployable):
             nemo_export_dir = Path(tmp_dir.name)
 
             model, model_configs, self.tokenizer = load_nemo_model(nemo_checkpoint_path, nemo_export_dir)
-            weights_dicts, model_configs = model_to_trtllm_ckpt(
+            # Save each rank as soon as it is converted instead of holding all ranks in memory.
+            for weight_dict, model_config in iter_model_to_trtllm_ckpt(
                 model=model,
                 nemo_model_config=model_configs,
                 nemo_export_dir=nemo_export_dir,
@@ -422,16 +421,15 @@ class TensorRTLLM(ITritonDeployable):
                 gpus_per_node=gpus_per_node,
                 use_parallel_embedding=use_parallel_embedding,
                 use_embedding_sharing=use_embedding_sharing,
-            )
-
-            for weight_dict, model_config in zip(weights_dicts, model_configs):
+            ):
                 rank = model_config.mapping.tp_rank
                 for k, v in weight_dict.items():
                     weight_dict[k] = numpy_to_torch(v)
 
                 safetensors.torch.save_file(weight_dict, os.path.join(self.model_dir, f'rank{rank}.safetensors'))
 
-            model_configs[0].to_json_file(os.path.join(self.model_dir, 'config.json'))
+                if model_config.mapping.rank == 0:
+                    model_config.to_json_file(os.path.join(self.model_dir, 'config.json'))
 
             tokenizer_path = os.path.join(nemo_export_dir, "tokenizer.model")
             if os.path.exists(tokenizer_path):
@@ -13,12 +13,15 @@
 # limitations under the License.
 
 
+import copy
 import csv
 import logging
-from typing import Dict, List, Tuple
+from collections import defaultdict
+from typing import Dict, Iterator, List, Tuple
 
 import numpy as np
 import tensorrt_llm
+import torch
 from tensorrt_llm._utils import pad_vocab_size
 from tensorrt_llm.functional import non_gated_version
 from tensorrt_llm.layers import MoeConfig
@@ -34,6 +37,8 @@ from nemo.export.trt_llm.converter.utils import DECODER_MODEL_TYPE, split
 
 LOGGER = logging.getLogger("NeMo")
 
+LAYERS_PREFIX = "transformer.layers."
+
 
 def get_config(decoder_type, config):
     if decoder_type == "llama":
@@ -66,19 +71,22 @@ def prompt_convert(prompt_config, prompt_weights):
         embedding_dim = vtokens_embeddings[0].shape[1]
 
         # pad tasks to longest task embedding table
+        padded_tables = torch.zeros(
+            (len(vtokens_embeddings), max_vtoken_len, embedding_dim),
+            dtype=vtokens_embeddings[0].dtype,
+            device=vtokens_embeddings[0].device,
+        )
         for i, vtoken_emb_table in enumerate(vtokens_embeddings):
-            padded_table = torch.zeros((max_vtoken_len, embedding_dim))
-            padded_table[: vtoken_emb_table.shape[0], :] = vtoken_emb_table
-            vtokens_embeddings[i] = padded_table
+            padded_tables[i, : vtoken_emb_table.shape[0], :].copy_(vtoken_emb_table)
 
-        vtokens_embeddings = torch.stack(vtokens_embeddings)
+        vtokens_embeddings = padded_tables
     else:
         vtokens_embeddings = prompt_weights["prompt_embeddings_weights"]
 
     return vtokens_embeddings
 
 
-def model_to_trtllm_ckpt(
+def iter_model_to_trtllm_ckpt(
     model,
     nemo_model_config,
     nemo_export_dir,
@@ -92,7 +100,11 @@ def model_to_trtllm_ckpt(
     use_distributed_convert: bool = False,
     model_parallel_rank: int = None,
     vocab_size: int = None,
-) -> Tuple[List[Dict], List[PretrainedConfig]]:
+) -> Iterator[Tuple[Dict, PretrainedConfig]]:
+    """Converts the model and yields the (weights dict, model config) pair of each rank in rank order.
+
+    Yielding rank by rank lets callers save or build each rank before the next one is assembled.
+    """
 
     if nemo_model_config.get("share_embeddings_and_output_weights", False) and not use_embedding_sharing:
         LOGGER.info(
@@ -129,10 +141,6 @@ def model_to_trtllm_ckpt(
             vocab_size = weights_dict["transformer.vocab_embedding.weight"].shape[0]
         vocab_size_padded = pad_vocab_size(vocab_size, tensor_parallel_size) if has_lm_head else vocab_size
 
-        if has_lm_head and vocab_size_padded != vocab_size:
-            pad_width = vocab_size_padded - vocab_size
-            lm_head_weight = np.pad(lm_head_weight, ((0, pad_width), (0, 0)), "constant", constant_values=0)
-
     world_size = tensor_parallel_size * pipeline_parallel_size
     hidden_act = nemo_model_config.get('activation')
     hidden_act = (
@@ -179,8 +187,6 @@ def model_to_trtllm_ckpt(
         'tp_size': tensor_parallel_size,
         'pp_size': pipeline_parallel_size,
     }
-    model_configs = []
-    weights_dicts = []
     num_layers = nemo_model_config.get('num_layers')
     rotary_scaling = nemo_model_config.get("seq_len_interpolation_factor")
 
@@ -192,15 +198,15 @@ def model_to_trtllm_ckpt(
 
     if use_distributed_convert:
         config["gpus_per_node"] = gpus_per_node
-        model_configs.append(get_config(decoder_type, config))
-        model_configs[0].mapping = tensorrt_llm.Mapping(
+        model_config = get_config(decoder_type, config)
+        model_config.mapping = tensorrt_llm.Mapping(
             world_size=world_size,
             rank=model_parallel_rank,
             tp_size=tensor_parallel_size,
             pp_size=pipeline_parallel_size,
         )
-        weights_dicts.append(weights_dict)
-        return weights_dicts, model_configs
+        yield weights_dict, model_config
+        return
 
     pp_key = {
         "transformer.vocab_embedding.weight",
@@ -212,7 +218,63 @@ def model_to_trtllm_ckpt(
 
     gpus_per_node = tensor_parallel_size if gpus_per_node is None else gpus_per_node
 
-    for i in range(world_size):
+    # Index the weights once by (TP rank, layer) so that each rank only visits the entries it owns.
+    # A None TP rank marks a weight replicated across TP ranks, a None layer marks a non-layer weight.
+    weights_index = defaultdict(list)
+    rename_post_layernorm = config.get("new_decoder_architecture", False)
+    for k, v in weights_dict.items():
+        if k in pp_key:
+            continue
+        new_key = k
+        tp_rank = None
+        if new_key.endswith(".bin"):  # TP split
+            new_key, tp_rank = new_key[: -len(".bin")].rsplit(".", 1)
+            tp_rank = int(tp_rank)
+        layer_num = None
+        if new_key.startswith(LAYERS_PREFIX):  # PP
+            layer_num = int(new_key[len(LAYERS_PREFIX) : new_key.index(".", len(LAYERS_PREFIX))])
+        if rename_post_layernorm and "post_layernorm" in new_key:
+            new_key = new_key.replace("post_layernorm", "mlp_layernorm")
+        weights_index[(tp_rank, layer_num)].append((new_key, v))
+
+    # The embedding and lm_head tensors are the same for every rank, so shard them once up front.
+    vocab_embedding_weight = weights_dict["transformer.vocab_embedding.weight"]
+    pos_embedding_weight = weights_dict.get("transformer.position_embedding.weight")
+    if use_parallel_embedding:
+        # split() returns v unchanged for a single split, so make every shard contiguous here.
+        vocab_embedding_shards = [
+            np.ascontiguousarray(split(vocab_embedding_weight, tensor_parallel_size, tp_rank))
+            for tp_rank in range(tensor_parallel_size)
+        ]
+        if pos_embedding_weight is not None:
+            pos_embedding_shards = [
+                np.ascontiguousarray(split(pos_embedding_weight, tensor_parallel_size, tp_rank))
+                for tp_rank in range(tensor_parallel_size)
+            ]
+    else:
+        vocab_embedding_shards = [vocab_embedding_weight] * tensor_parallel_size
+        pos_embedding_shards = [pos_embedding_weight] * tensor_parallel_size
+    if has_lm_head:
+        # lm_head is padded to vocab_size_padded rows. Only the shards reaching into the padded rows need new
+        # memory, the shards fully covered by the real vocabulary are taken from the unpadded weight.
+        shard_rows = vocab_size_padded // tensor_parallel_size
+        num_full_shards = vocab_size // shard_rows
+        lm_head_shards = [
+            np.ascontiguousarray(split(lm_head_weight[: num_full_shards * shard_rows], num_full_shards, tp_rank))
+            for tp_rank in range(num_full_shards)
+        ]
+        for tp_rank in range(num_full_shards, tensor_parallel_size):
+            padded_shard = np.zeros((shard_rows, lm_head_weight.shape[1]), dtype=lm_head_weight.dtype)
+            lm_head_tail = lm_head_weight[tp_rank * shard_rows : (tp_rank + 1) * shard_rows]
+            padded_shard[: lm_head_tail.shape[0]] = lm_head_tail
+            lm_head_shards.append(padded_shard)
+
+    # The config only differs by its mapping across ranks, so build it once and copy it per rank.
+    config["gpus_per_node"] = gpus_per_node
+    base_model_config = get_config(decoder_type, config)
+
+    def build_rank(i):
+        """Assembles the weights and the model config of rank i from the shared, read-only inputs above."""
         mapping = tensorrt_llm.Mapping(
             world_size=world_size,
             rank=i,
@@ -221,59 +283,73 @@ def model_to_trtllm_ckpt(
             gpus_per_node=gpus_per_node,
         )
         layers_range = mapping.pp_layers(num_layers)
+        layers_offset = layers_range[0]
 
         weights_dict_local = {}
-        for k, v in weights_dict.items():
-            if k in pp_key:
-                continue
-            new_key = k
-            if new_key.endswith(".bin"):  # TP split
-                if new_key.endswith(f"{mapping.tp_rank}.bin"):
-                    new_key = new_key.replace(f".{mapping.tp_rank}.bin", "")
-                else:
-                    continue
-            if "layers" in new_key:  # PP
-                layer_num = int(new_key.split(".")[2])
-                if layer_num in layers_range:
-                    new_key = new_key.replace(f"layers.{layer_num}", f"layers.{layer_num-layers_range[0]}")
-            if config.get("new_decoder_architecture", False) and "post_layernorm" in new_key:
-                new_key = new_key.replace("post_layernorm", "mlp_layernorm")
-            weights_dict_local[new_key] = v
+        for tp_rank in (None, mapping.tp_rank):
+            for new_key, v in weights_index.get((tp_rank, None), ()):
+                weights_dict_local[new_key] = v
+            for layer_num in layers_range:
+                layer_name, local_layer_name = f"layers.{layer_num}", f"layers.{layer_num - layers_offset}"
+                for new_key, v in weights_index.get((tp_rank, layer_num), ()):
+                    weights_dict_local[new_key.replace(layer_name, local_layer_name, 1)] = v
 
         if mapping.is_first_pp_rank():
-            embedding_weight = (
-                np.ascontiguousarray(
-                    split(weights_dict["transformer.vocab_embedding.weight"], mapping.tp_size, mapping.tp_rank)
-                )
-                if use_parallel_embedding
-                else weights_dict["transformer.vocab_embedding.weight"]
-            )
-
-            weights_dict_local["transformer.vocab_embedding.weight"] = embedding_weight
-
-            pos_embedding_weight = weights_dict.get("transformer.position_embedding.weight")
+            weights_dict_local["transformer.vocab_embedding.weight"] = vocab_embedding_shards[mapping.tp_rank]
             if pos_embedding_weight is not None:
-                if use_parallel_embedding:
-                    pos_embedding_weight = np.ascontiguousarray(
-                        split(pos_embedding_weight, mapping.tp_size, mapping.tp_rank)
-                    )
-                weights_dict_local["transformer.position_embedding.weight"] = pos_embedding_weight
+                weights_dict_local["transformer.position_embedding.weight"] = pos_embedding_shards[mapping.tp_rank]
 
         if mapping.is_last_pp_rank():
             if has_lm_head:
-                weights_dict_local["lm_head.weight"] = np.ascontiguousarray(
-                    split(lm_head_weight, mapping.tp_size, mapping.tp_rank)
-                )
+                weights_dict_local["lm_head.weight"] = lm_head_shards[mapping.tp_rank]
             weights_dict_local["transformer.ln_f.weight"] = weights_dict["transformer.ln_f.weight"]
 
             ln_f_bias = weights_dict.get("transformer.ln_f.bias")
             if ln_f_bias is not None:
                 weights_dict_local["transformer.ln_f.bias"] = ln_f_bias
 
-        config["gpus_per_node"] = gpus_per_node
-        model_config = get_config(decoder_type, config)
+        model_config = copy.copy(base_model_config)
         model_config.mapping = mapping
+        return weights_dict_local, model_config
+
+    for i in range(world_size):
+        yield build_rank(i)
+
+
+def model_to_trtllm_ckpt(
+    model,
+    nemo_model_config,
+    nemo_export_dir,
+    decoder_type: str,
+    dtype: str = "bfloat16",
+    tensor_parallel_size: int = 1,
+    pipeline_parallel_size: int = 1,
+    gpus_per_node: int = None,
+    use_parallel_embedding: bool = False,
+    use_embedding_sharing: bool = False,
+    use_distributed_convert: bool = False,
+    model_parallel_rank: int = None,
+    vocab_size: int = None,
+) -> Tuple[List[Dict], List[PretrainedConfig]]:
+    """Converts the model and returns the weights dicts and model configs of all ranks."""
+    weights_dicts = []
+    model_configs = []
+    for weights_dict, model_config in iter_model_to_trtllm_ckpt(
+        model=model,
+        nemo_model_config=nemo_model_config,
+        nemo_export_dir=nemo_export_dir,
+        decoder_type=decoder_type,
+        dtype=dtype,
+        tensor_parallel_size=tensor_parallel_size,
+        pipeline_parallel_size=pipeline_parallel_size,
+        gpus_per_node=gpus_per_node,
+        use_parallel_embedding=use_parallel_embedding,
+        use_embedding_sharing=use_embedding_sharing,
+        use_distributed_convert=use_distributed_convert,
+        model_parallel_rank=model_parallel_rank,
+        vocab_size=vocab_size,
+    ):
+        weights_dicts.append(weights_dict)
         model_configs.append(model_config)
-        weights_dicts.append(weights_dict_local)
 
     return weights_dicts, model_configs
@@ -466,13 +466,31 @@ def split_and_save_weight(tp_rank, saved_dir, split_factor, key, vals, storage_t
 
 
 def split(v, tp_size, idx, dim=0):
-    """Splits the np tensor v on dim and return the idx's slice."""
+    """Splits the np tensor v on dim and return the idx's slice.
+
+    With tp_size > 1 the slice is C-contiguous; with tp_size == 1, v is returned unchanged.
+    """
     if tp_size == 1:
         return v
     if len(v.shape) == 1:
-        return np.ascontiguousarray(np.split(v, tp_size)[idx])
-    else:
-        return np.ascontiguousarray(np.split(v, tp_size, axis=dim)[idx])
+        dim = 0
+    # Validate like np.split(v, tp_size, axis=dim)[idx] did.
+    if v.shape[dim] % tp_size != 0:
+        raise ValueError("array split does not result in an equal division")
+    if not -tp_size <= idx < tp_size:
+        raise IndexError(f"split index {idx} is out of range for {tp_size} splits")
+    idx %= tp_size
+    chunk = v.shape[dim] // tp_size
+    slices = [slice(None)] * v.ndim
+    slices[dim] = slice(idx * chunk, (idx + 1) * chunk)
+    src = v[tuple(slices)]
+    if src.flags["C_CONTIGUOUS"]:
+        # E.g. slices along dim 0 of a C-contiguous array, which can be returned as views.
+        return src
+    # Copy the slice into a fresh contiguous buffer without materializing all tp_size views.
+    out = np.empty(src.shape, dtype=v.dtype)
+    np.copyto(out, src)
+    return out
 
 
 def init_model_parallel_from_nemo(reshard_model):
@@ -35,17 +35,10 @@ LOGGER = logging.getLogger("NeMo")
 
 
 def is_nemo_file(path):
-    flag = False
-
-    if path is not None:
-        if len(path) > 5:
-            pc = Path(path)
-            if pc.exists():
-                if pc.is_file():
-                    if path[-5 : len(path)] == ".nemo":
-                        flag = True
-
-    return flag
+    # Cheap string checks first, a single stat() call last.
+    if not (isinstance(path, str) and len(path) > 5 and path.endswith(".nemo")):
+        return False
+    return os.path.isfile(path)
 
 
 class TarFileSystemReader(FileSystemReader):
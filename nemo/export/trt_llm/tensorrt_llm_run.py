@@ -19,6 +19,7 @@ import logging
 import os
 import tempfile
 from dataclasses import dataclass
+from itertools import chain
 from pathlib import Path
 from typing import List, Optional
 
@@ -30,7 +31,7 @@ from tensorrt_llm.lora_manager import LoraManager
 from tensorrt_llm.quantization import QuantMode
 from tensorrt_llm.runtime import ModelConfig, ModelRunner, ModelRunnerCpp, SamplingConfig
 
-from transformers import PreTrainedTokenizer
+from transformers import PreTrainedTokenizer, PreTrainedTokenizerBase
 
 LOGGER = logging.getLogger("NeMo")
 
@@ -758,43 +759,75 @@ def to_word_list_format(
     '''
     assert tokenizer is not None, "need to set tokenizer"
 
-    flat_ids = []
-    offsets = []
     # The encoding of a single word can't always be trusted. See
     #   https://github.com/NVIDIA/NeMo/blob/bb575b72fd0be51ae10cc77d9f89ddb9e9d3b96d/nemo/collections/nlp/modules/common/text_generation_strategy.py#L229
     ids_ref = tokenizer.encode(ref_str)
-    for word_dict_item in word_dict:
-        item_flat_ids = []
-        item_offsets = []
 
+    # Collect the words of all samples first so that they can be tokenized in a single batched call.
+    batch_words = []
+    for word_dict_item in word_dict:
         if isinstance(word_dict_item[0], bytes):
             word_dict_item = [word_dict_item[0].decode()]
 
-        words = list(csv.reader(word_dict_item))[0]
-        for word in words:
-            ids = tokenizer.encode(f"{ref_str}{word}")
-            if ids[0 : len(ids_ref)] == ids_ref:
-                # It worked! We can obtain the token(s) associated to `word` by stripping the prefix tokens.
-                ids = ids[len(ids_ref) :]
-            else:
-                # Unfortunately the prefix was merged with `word`. We could try with a different prefix, but
-                # for now we just use the basic encoding since this should be a very rare edge case.
-                ids = tokenizer.encode(word)
-                logging.warning(f"The encoding of word '{word}' into tokens {ids} might be incorrect")
+        words = word_dict_item[0]
+        if '"' in words or "\n" in words or "\r" in words:
+            # Quoted words may contain commas, so let csv handle them.
+            batch_words.append(list(csv.reader(word_dict_item))[0])
+        else:
+            batch_words.append(words.split(",") if words else [])
 
-            if len(ids) == 0:
-                continue
+    all_words = [word for words in batch_words for word in words]
+    all_ids = _batch_encode(tokenizer, [f"{ref_str}{word}" for word in all_words])
 
-            item_flat_ids += ids
-            item_offsets.append(len(ids))
+    n_ref = len(ids_ref)
+    fallback_idx = []
+    for i, ids in enumerate(all_ids):
+        if n_ref == 1:
+            # A single-token prefix is compared directly instead of slicing a new list for every word.
+            matched = len(ids) > 0 and ids[0] == ids_ref[0]
+        else:
+            matched = ids[:n_ref] == ids_ref
 
-        flat_ids.append(np.array(item_flat_ids))
-        offsets.append(np.cumsum(np.array(item_offsets)))
+        if matched:
+            # It worked! We can obtain the token(s) associated to `word` by stripping the prefix tokens.
+            all_ids[i] = ids[n_ref:]
+        else:
+            # Unfortunately the prefix was merged with `word`. We could try with a different prefix, but
+            # for now we just use the basic encoding since this should be a very rare edge case.
+            fallback_idx.append(i)
+
+    if fallback_idx:
+        fallback_ids = _batch_encode(tokenizer, [all_words[i] for i in fallback_idx])
+        for i, ids in zip(fallback_idx, fallback_ids):
+            all_ids[i] = ids
+            logging.warning(f"The encoding of word '{all_words[i]}' into tokens {ids} might be incorrect")
+
+    batch_ids = []
+    start = 0
+    for words in batch_words:
+        batch_ids.append([ids for ids in all_ids[start : start + len(words)] if len(ids) > 0])
+        start += len(words)
+
+    item_lens = [sum(map(len, item_ids)) for item_ids in batch_ids]
+    pad_to = max(1, max(item_lens))
+
+    # Fill a single preallocated [batch, 2, pad_to] buffer instead of padding and stacking per sample.
+    word_list = np.zeros((len(batch_ids), 2, pad_to), dtype=np.int32)
+    word_list[:, 1, :] = -1
+    for i, (item_ids, item_len) in enumerate(zip(batch_ids, item_lens)):
+        word_list[i, 0, :item_len] = np.fromiter(chain.from_iterable(item_ids), dtype=np.int32, count=item_len)
+        word_list[i, 1, : len(item_ids)] = np.cumsum(
+            np.fromiter(map(len, item_ids), dtype=np.int32, count=len(item_ids)), dtype=np.int32
+        )
 
-    pad_to = max(1, max(len(ids) for ids in flat_ids))
+    return word_list
 
-    for i, (ids, offs) in enumerate(zip(flat_ids, offsets)):
-        flat_ids[i] = np.pad(ids, (0, pad_to - len(ids)), constant_values=0)
-        offsets[i] = np.pad(offs, (0, pad_to - len(offs)), constant_values=-1)
 
-    return np.array([flat_ids, offsets], dtype="int32").transpose((1, 0, 2))
+def _batch_encode(tokenizer, texts: List[str]) -> List[List[int]]:
+    """Encodes a list of strings, using a single batched call for Hugging Face tokenizers."""
+    if len(texts) == 0:
+        return []
+    if isinstance(tokenizer, PreTrainedTokenizerBase):
+        # Equivalent to calling tokenizer.encode on each text, but fast tokenizers process the batch natively.
+        return list(tokenizer(texts)["input_ids"])
+    return [tokenizer.encode(text) for text in texts]